@@ -13,53 +13,109 @@ from typing import Optional, Dict, List, Callable, Any
 import re
 import json
 import asyncio
+import hashlib
+import heapq
+import logging
+import sys
 import time
 import os
 import traceback
+import types
 import urllib.request
 import urllib.parse
 import urllib.error
 from datetime import datetime
 import difflib
 
+try:
+    import aiofiles
+except ImportError:
+    aiofiles = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+logger = logging.getLogger("agent_hotswap")
+
+
+def _stat_or_none(filepath: str) -> Optional[os.stat_result]:
+    """Stat a file in one syscall, returning None when it doesn't exist."""
+    try:
+        return os.stat(filepath)
+    except FileNotFoundError:
+        return None
+
+
+def _json_loads(data: bytes) -> Any:
+    """Parse config bytes with orjson when available, stdlib json otherwise."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps_bytes(obj: Any) -> bytes:
+    """Serialize config data to indented UTF-8 bytes, preferring orjson."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=4, ensure_ascii=False).encode("utf-8")
+
 
 class PersonaDownloadManager:
     """Manages downloading and applying persona configurations from remote repositories."""
 
-    def __init__(self, valves, get_config_filepath_func):
+    def __init__(self, valves, get_config_filepath_func, persona_cache):
         self.valves = valves
         self.get_config_filepath = get_config_filepath_func
+        self.persona_cache = persona_cache
 
     def is_trusted_domain(self, url: str) -> bool:
         """Check if URL domain is in the trusted whitelist."""
         try:
-            print(f"[DOMAIN DEBUG] Checking URL: {url}")
+            logger.debug("[DOMAIN DEBUG] Checking URL: %s", url)
             parsed = urllib.parse.urlparse(url)
-            print(
-                f"[DOMAIN DEBUG] Parsed URL - scheme: {parsed.scheme}, netloc: {parsed.netloc}"
+            logger.debug(
+                "[DOMAIN DEBUG] Parsed URL - scheme: %s, netloc: %s",
+                parsed.scheme,
+                parsed.netloc,
             )
 
             if not parsed.scheme or parsed.scheme.lower() not in ["https"]:
-                print(f"[DOMAIN DEBUG] Scheme check failed - scheme: '{parsed.scheme}'")
+                logger.error(
+                    "[DOMAIN DEBUG] Scheme check failed - scheme: '%s'", parsed.scheme
+                )
                 return False
 
-            print(f"[DOMAIN DEBUG] Scheme check passed")
+            logger.debug("[DOMAIN DEBUG] Scheme check passed")
 
             trusted_domains_raw = self.valves.trusted_domains
             trusted_domains = [
                 d.strip().lower() for d in trusted_domains_raw.split(",")
             ]
-            print(f"[DOMAIN DEBUG] Trusted domains raw: '{trusted_domains_raw}'")
-            print(f"[DOMAIN DEBUG] Trusted domains processed: {trusted_domains}")
-            print(f"[DOMAIN DEBUG] URL netloc (lowercase): '{parsed.netloc.lower()}'")
+            logger.debug(
+                "[DOMAIN DEBUG] Trusted domains raw: '%s'", trusted_domains_raw
+            )
+            logger.debug(
+                "[DOMAIN DEBUG] Trusted domains processed: %s", trusted_domains
+            )
+            logger.debug(
+                "[DOMAIN DEBUG] URL netloc (lowercase): '%s'", parsed.netloc.lower()
+            )
 
             is_trusted = parsed.netloc.lower() in trusted_domains
-            print(f"[DOMAIN DEBUG] Domain trusted check result: {is_trusted}")
+            logger.debug("[DOMAIN DEBUG] Domain trusted check result: %s", is_trusted)
 
             return is_trusted
 
         except Exception as e:
-            print(f"[DOMAIN DEBUG] Exception in domain check: {e}")
+            logger.error("[DOMAIN DEBUG] Exception in domain check: %s", e)
             traceback.print_exc()
             return False
 
@@ -67,82 +123,92 @@ class PersonaDownloadManager:
         """Download personas from remote repository with validation."""
         download_url = url or self.valves.default_personas_repo
 
-        print(f"[DOWNLOAD DEBUG] Starting download from: {download_url}")
+        logger.debug("[DOWNLOAD DEBUG] Starting download from: %s", download_url)
 
         # Validate URL
-        print(f"[DOWNLOAD DEBUG] Checking if domain is trusted...")
+        logger.debug("[DOWNLOAD DEBUG] Checking if domain is trusted...")
         if not self.is_trusted_domain(download_url):
             error_msg = (
                 f"Untrusted domain. Allowed domains: {self.valves.trusted_domains}"
             )
-            print(f"[DOWNLOAD DEBUG] Domain check failed: {error_msg}")
+            logger.error("[DOWNLOAD DEBUG] Domain check failed: %s", error_msg)
             return {"success": False, "error": error_msg, "url": download_url}
 
-        print(f"[DOWNLOAD DEBUG] Domain check passed")
+        logger.debug("[DOWNLOAD DEBUG] Domain check passed")
 
         try:
             # Download with timeout
-            print(f"[DOWNLOAD DEBUG] Creating HTTP request...")
+            logger.debug("[DOWNLOAD DEBUG] Creating HTTP request...")
             req = urllib.request.Request(
                 download_url, headers={"User-Agent": "OpenWebUI-AgentHotswap/3.1"}
             )
-            print(f"[DOWNLOAD DEBUG] Request created, opening connection...")
+            logger.debug("[DOWNLOAD DEBUG] Request created, opening connection...")
 
             with urllib.request.urlopen(
                 req, timeout=self.valves.download_timeout
             ) as response:
-                print(f"[DOWNLOAD DEBUG] Connection opened, status: {response.status}")
-                print(f"[DOWNLOAD DEBUG] Response headers: {dict(response.headers)}")
+                logger.debug(
+                    "[DOWNLOAD DEBUG] Connection opened, status: %s", response.status
+                )
+                logger.debug(
+                    "[DOWNLOAD DEBUG] Response headers: %s", dict(response.headers)
+                )
 
                 if response.status != 200:
                     error_msg = f"HTTP {response.status}: {response.reason}"
-                    print(f"[DOWNLOAD DEBUG] HTTP error: {error_msg}")
+                    logger.error("[DOWNLOAD DEBUG] HTTP error: %s", error_msg)
                     return {"success": False, "error": error_msg, "url": download_url}
 
-                print(f"[DOWNLOAD DEBUG] Reading response content...")
+                logger.debug("[DOWNLOAD DEBUG] Reading response content...")
                 content = response.read().decode("utf-8")
                 content_size = len(content)
-                print(
-                    f"[DOWNLOAD DEBUG] Content read successfully: {content_size} bytes"
+                logger.debug(
+                    "[DOWNLOAD DEBUG] Content read successfully: %s bytes", content_size
                 )
-                print(
-                    f"[DOWNLOAD DEBUG] Content preview (first 200 chars): {content[:200]}"
+                logger.debug(
+                    "[DOWNLOAD DEBUG] Content preview (first 200 chars): %s",
+                    content[:200],
                 )
 
                 # Basic size check (prevent huge files)
                 if content_size > 1024 * 1024:  # 1MB limit
                     error_msg = f"File too large: {content_size} bytes (max 1MB)"
-                    print(f"[DOWNLOAD DEBUG] Size check failed: {error_msg}")
+                    logger.error("[DOWNLOAD DEBUG] Size check failed: %s", error_msg)
                     return {"success": False, "error": error_msg, "url": download_url}
 
-                print(f"[DOWNLOAD DEBUG] Size check passed")
+                logger.debug("[DOWNLOAD DEBUG] Size check passed")
 
                 # Parse JSON
-                print(f"[DOWNLOAD DEBUG] Parsing JSON...")
+                logger.debug("[DOWNLOAD DEBUG] Parsing JSON...")
                 try:
                     remote_personas = json.loads(content)
-                    print(
-                        f"[DOWNLOAD DEBUG] JSON parsed successfully, {len(remote_personas)} items found"
+                    logger.debug(
+                        "[DOWNLOAD DEBUG] JSON parsed successfully, %s items found",
+                        len(remote_personas),
                     )
-                    print(
-                        f"[DOWNLOAD DEBUG] Top-level keys: {list(remote_personas.keys())[:5]}"
+                    logger.debug(
+                        "[DOWNLOAD DEBUG] Top-level keys: %s",
+                        list(remote_personas.keys())[:5],
                     )
                 except json.JSONDecodeError as e:
                     error_msg = f"Invalid JSON: {str(e)}"
-                    print(f"[DOWNLOAD DEBUG] JSON parsing failed: {error_msg}")
-                    print(
-                        f"[DOWNLOAD DEBUG] Content that failed parsing: {content[:500]}"
+                    logger.error("[DOWNLOAD DEBUG] JSON parsing failed: %s", error_msg)
+                    logger.error(
+                        "[DOWNLOAD DEBUG] Content that failed parsing: %s",
+                        content[:500],
                     )
                     return {"success": False, "error": error_msg, "url": download_url}
 
                 # Validate structure
-                print(f"[DOWNLOAD DEBUG] Validating persona structure...")
+                logger.debug("[DOWNLOAD DEBUG] Validating persona structure...")
                 validation_errors = PersonaValidator.validate_personas_config(
                     remote_personas
                 )
                 if validation_errors:
                     error_msg = f"Validation failed: {'; '.join(validation_errors[:3])}"
-                    print(f"[DOWNLOAD DEBUG] Validation failed: {validation_errors}")
+                    logger.error(
+                        "[DOWNLOAD DEBUG] Validation failed: %s", validation_errors
+                    )
                     return {
                         "success": False,
                         "error": error_msg,
@@ -150,8 +216,9 @@ class PersonaDownloadManager:
                         "validation_errors": validation_errors,
                     }
 
-                print(
-                    f"[DOWNLOAD DEBUG] Validation passed - {len(remote_personas)} personas"
+                logger.debug(
+                    "[DOWNLOAD DEBUG] Validation passed - %s personas",
+                    len(remote_personas),
                 )
 
                 return {
@@ -164,13 +231,15 @@ class PersonaDownloadManager:
 
         except urllib.error.URLError as e:
             error_msg = f"Download failed: {str(e)}"
-            print(f"[DOWNLOAD DEBUG] URLError: {error_msg}")
-            print(f"[DOWNLOAD DEBUG] URLError details: {type(e).__name__}: {e}")
+            logger.error("[DOWNLOAD DEBUG] URLError: %s", error_msg)
+            logger.error(
+                "[DOWNLOAD DEBUG] URLError details: %s: %s", type(e).__name__, e
+            )
             return {"success": False, "error": error_msg, "url": download_url}
         except Exception as e:
             error_msg = f"Unexpected error: {str(e)}"
-            print(f"[DOWNLOAD DEBUG] Unexpected error: {error_msg}")
-            print(f"[DOWNLOAD DEBUG] Exception type: {type(e).__name__}")
+            logger.error("[DOWNLOAD DEBUG] Unexpected error: %s", error_msg)
+            logger.error("[DOWNLOAD DEBUG] Exception type: %s", type(e).__name__)
             traceback.print_exc()
             return {"success": False, "error": error_msg, "url": download_url}
 
@@ -287,10 +356,10 @@ class PersonaDownloadManager:
             backup_path = os.path.join(backup_dir, backup_filename)
 
             # Write backup
-            with open(backup_path, "w", encoding="utf-8") as f:
-                json.dump(current_personas, f, indent=4, ensure_ascii=False)
+            with open(backup_path, "wb") as f:
+                f.write(_json_dumps_bytes(current_personas))
 
-            print(f"[BACKUP] Created backup: {backup_path}")
+            logger.debug("[BACKUP] Created backup: %s", backup_path)
 
             # Auto-cleanup old backups
             self._cleanup_old_backups(backup_dir)
@@ -298,21 +367,23 @@ class PersonaDownloadManager:
             return backup_filename
 
         except Exception as e:
-            print(f"[BACKUP] Error creating backup: {e}")
+            logger.error("[BACKUP] Error creating backup: %s", e)
             return f"Error: {str(e)}"
 
     def _cleanup_old_backups(self, backup_dir: str):
         """Remove old backup files, keeping only the most recent ones."""
         try:
-            # Get all backup files
+            # Get all backup files - scandir reuses the stat gathered
+            # during the directory listing where the platform supports it
             backup_files = []
-            for filename in os.listdir(backup_dir):
-                if filename.startswith("personas_backup_") and filename.endswith(
-                    ".json"
-                ):
-                    filepath = os.path.join(backup_dir, filename)
-                    mtime = os.path.getmtime(filepath)
-                    backup_files.append((mtime, filepath, filename))
+            with os.scandir(backup_dir) as entries:
+                for entry in entries:
+                    if entry.name.startswith(
+                        "personas_backup_"
+                    ) and entry.name.endswith(".json"):
+                        backup_files.append(
+                            (entry.stat().st_mtime, entry.path, entry.name)
+                        )
 
             # Sort by modification time (newest first)
             backup_files.sort(reverse=True)
@@ -321,10 +392,10 @@ class PersonaDownloadManager:
             files_to_remove = backup_files[self.valves.backup_count :]
             for _, filepath, filename in files_to_remove:
                 os.remove(filepath)
-                print(f"[BACKUP] Removed old backup: {filename}")
+                logger.debug("[BACKUP] Removed old backup: %s", filename)
 
         except Exception as e:
-            print(f"[BACKUP] Error during cleanup: {e}")
+            logger.error("[BACKUP] Error during cleanup: %s", e)
 
     async def download_and_apply_personas(
         self, url: str = None, merge_strategy: str = "merge"
@@ -343,7 +414,7 @@ class PersonaDownloadManager:
 
             # Create backup first
             backup_name = self.create_backup(current_personas)
-            print(f"[DOWNLOAD APPLY] Backup created: {backup_name}")
+            logger.debug("[DOWNLOAD APPLY] Backup created: %s", backup_name)
 
             # Analyze differences for reporting
             analysis = self.analyze_differences(remote_personas, current_personas)
@@ -368,11 +439,12 @@ class PersonaDownloadManager:
 
             # Write the final configuration
             config_path = self.get_config_filepath()
-            with open(config_path, "w", encoding="utf-8") as f:
-                json.dump(final_personas, f, indent=4, ensure_ascii=False)
+            with open(config_path, "wb") as f:
+                f.write(_json_dumps_bytes(final_personas))
 
-            print(
-                f"[DOWNLOAD APPLY] Applied configuration - {len(final_personas)} personas"
+            logger.debug(
+                "[DOWNLOAD APPLY] Applied configuration - %s personas",
+                len(final_personas),
             )
 
             return {
@@ -390,48 +462,57 @@ class PersonaDownloadManager:
             }
 
         except Exception as e:
-            print(f"[DOWNLOAD APPLY] Error applying download: {e}")
+            logger.error("[DOWNLOAD APPLY] Error applying download: %s", e)
             traceback.print_exc()
             return {"success": False, "error": f"Failed to apply download: {str(e)}"}
 
     def _read_current_personas(self) -> Dict:
-        """Read current personas configuration from file."""
+        """Read current personas through the shared cache."""
         try:
-            config_path = self.get_config_filepath()
-            if not os.path.exists(config_path):
-                return {}
-
-            with open(config_path, "r", encoding="utf-8") as f:
-                return json.load(f)
+            return dict(self.persona_cache.get_personas(self.get_config_filepath()))
         except Exception as e:
-            print(f"[DOWNLOAD APPLY] Error reading current personas: {e}")
+            logger.error("[DOWNLOAD APPLY] Error reading current personas: %s", e)
             return {}
 
 
 class PersonaValidator:
     """Validates persona configuration structure."""
 
+    # field -> (required, expected type, type label, must be non-empty)
+    _SCHEMA = {
+        "name": (True, str, "string", True),
+        "prompt": (True, str, "string", True),
+        "description": (True, str, "string", True),
+        "rules": (False, list, "list", False),
+    }
+    _MISSING = object()
+
     @staticmethod
     def validate_persona_config(persona: Dict) -> List[str]:
-        """Validate a single persona configuration.
+        """Validate a single persona configuration against the field schema.
 
         Returns:
             List of error messages, empty if valid
         """
         errors = []
-        required_fields = ["name", "prompt", "description"]
-
-        for field in required_fields:
-            if field not in persona:
-                errors.append(f"Missing required field: {field}")
-            elif not isinstance(persona[field], str):
-                errors.append(f"Field '{field}' must be a string")
-            elif not persona[field].strip():
-                errors.append(f"Field '{field}' cannot be empty")
-
-        # Validate optional fields
-        if "rules" in persona and not isinstance(persona["rules"], list):
-            errors.append("Field 'rules' must be a list")
+        append_error = errors.append
+        get_field = persona.get
+        missing = PersonaValidator._MISSING
+
+        for field, (
+            required,
+            expected_type,
+            type_label,
+            non_empty,
+        ) in PersonaValidator._SCHEMA.items():
+            value = get_field(field, missing)
+            if value is missing:
+                if required:
+                    append_error(f"Missing required field: {field}")
+            elif not isinstance(value, expected_type):
+                append_error(f"Field '{field}' must be a {type_label}")
+            elif non_empty and not value.strip():
+                append_error(f"Field '{field}' cannot be empty")
 
         return errors
 
@@ -469,127 +550,245 @@ class PersonaValidator:
 class PatternCompiler:
     """Pre-compiles and manages regex patterns for efficient persona detection."""
 
+    # Above this many commands an Aho-Corasick automaton (when installed)
+    # replaces the regex scan - DFA traversal has no backtracking and stays
+    # O(window length) no matter how large the keyword set grows
+    _AUTOMATON_THRESHOLD = 50
+
     def __init__(self, config_valves):
         self.valves = config_valves
-        self.persona_patterns = {}
-        self.reset_pattern = None
-        self.list_pattern = None
+        self.combined_pattern = None
+        self.automaton = None
+        self.command_dispatch = {}
+        self.reset_keyword_set = frozenset()
         self._last_compiled_config = None
+        self._compiled_personas_ref = None
         self._compile_patterns()
 
-    def _compile_patterns(self):
-        """Compile all regex patterns once for reuse."""
+    def _dispatch_key(self, word: str) -> str:
+        """Normalize a keyword for dispatch lookup based on case sensitivity."""
+        return word if self.valves.case_sensitive else word.lower()
+
+    @staticmethod
+    def _trie_to_regex(words: List[str]) -> str:
+        """Convert a keyword list into a trie-collapsed regex alternation.
+
+        Shared prefixes are emitted once (e.g. 'coder'/'collab' become
+        'co(?:der|llab)') and single-character branches collapse into
+        character classes, so the compiled NFA has far fewer states than a
+        flat alternation. Greedy optional groups preserve longest-match
+        semantics for keywords that prefix each other.
+        """
+        trie = {}
+        for word in words:
+            node = trie
+            for char in word:
+                node = node.setdefault(char, {})
+            node[""] = {}  # End-of-word marker
+
+        def emit(node: Dict) -> str:
+            has_end = "" in node
+            alternatives = []
+            char_class = []
+            for char in sorted(node):
+                if char == "":
+                    continue
+                suffix = emit(node[char])
+                if suffix:
+                    alternatives.append(re.escape(char) + suffix)
+                else:
+                    char_class.append(re.escape(char))
+            if char_class:
+                if len(char_class) == 1:
+                    alternatives.append(char_class[0])
+                else:
+                    alternatives.append(f"[{''.join(char_class)}]")
+            if not alternatives:
+                return ""
+            if len(alternatives) == 1 and not has_end:
+                return alternatives[0]
+            combined = f"(?:{'|'.join(alternatives)})"
+            return f"{combined}?" if has_end else combined
+
+        return emit(trie)
+
+    def _compile_patterns(self, available_personas: Optional[Dict] = None):
+        """Compile a single combined command pattern once for reuse."""
         try:
+            persona_keys = (
+                tuple(available_personas.keys()) if available_personas else ()
+            )
+
             # Get current config state for change detection
             current_config = {
                 "prefix": self.valves.keyword_prefix,
                 "reset_keywords": self.valves.reset_keywords,
                 "list_keyword": self.valves.list_command_keyword,
                 "case_sensitive": self.valves.case_sensitive,
+                "persona_keys": persona_keys,
             }
 
             # Only recompile if config changed
             if current_config == self._last_compiled_config:
                 return
 
-            print(
-                f"[PATTERN COMPILER] Compiling patterns for prefix '{self.valves.keyword_prefix}'"
+            logger.debug(
+                "[PATTERN COMPILER] Compiling patterns for prefix '%s'",
+                self.valves.keyword_prefix,
             )
 
-            # Compile base patterns
             prefix_escaped = re.escape(self.valves.keyword_prefix)
             flags = 0 if self.valves.case_sensitive else re.IGNORECASE
 
-            # Compile list command pattern
-            list_cmd = self.valves.list_command_keyword
-            if not self.valves.case_sensitive:
-                list_cmd = list_cmd.lower()
-            self.list_pattern = re.compile(
-                rf"{prefix_escaped}{re.escape(list_cmd)}\b", flags
+            # Build the dispatch table mapping matched tokens to commands.
+            # Built-in commands take precedence over persona keys on collision.
+            reset_keyword_set = frozenset(
+                self._dispatch_key(keyword.strip())
+                for keyword in self.valves.reset_keywords.split(",")
             )
-
-            # Compile reset patterns
-            reset_keywords = [
-                word.strip() for word in self.valves.reset_keywords.split(",")
-            ]
-            reset_pattern_parts = []
-            for keyword in reset_keywords:
-                if not self.valves.case_sensitive:
-                    keyword = keyword.lower()
-                reset_pattern_parts.append(re.escape(keyword))
-
-            reset_pattern_str = (
-                rf"{prefix_escaped}(?:{'|'.join(reset_pattern_parts)})\b"
+            dispatch = {}
+            for keyword in reset_keyword_set:
+                dispatch[keyword] = "reset"
+            dispatch[self._dispatch_key(self.valves.list_command_keyword)] = (
+                "list_personas"
             )
-            self.reset_pattern = re.compile(reset_pattern_str, flags)
+            dispatch["download_personas"] = "download_personas"
+            # Interned keys make the dispatch lookups and downstream persona
+            # dict hits pointer-fast and shared across Filter instances
+            for persona_key in persona_keys:
+                dispatch.setdefault(
+                    sys.intern(self._dispatch_key(persona_key)),
+                    sys.intern(persona_key),
+                )
 
-            # Compile download command pattern
-            self.download_pattern = re.compile(
-                rf"{prefix_escaped}download_personas\b", flags
+            # Single trie-collapsed pattern - one C-level scan covers every
+            # command, with shared prefixes merged so overlapping keywords
+            # (e.g. 'code' vs 'coder') match unambiguously.
+            pattern_body = self._trie_to_regex(sorted(dispatch))
+            self.combined_pattern = re.compile(
+                rf"{prefix_escaped}(?P<cmd>{pattern_body})\b", flags
             )
-
-            # Clear old persona patterns - they'll be compiled on demand
-            self.persona_patterns.clear()
+            self.command_dispatch = dispatch
+            self.reset_keyword_set = reset_keyword_set
+
+            self.automaton = None
+            if ahocorasick is not None and len(dispatch) > self._AUTOMATON_THRESHOLD:
+                automaton = ahocorasick.Automaton()
+                search_prefix = (
+                    self.valves.keyword_prefix
+                    if self.valves.case_sensitive
+                    else self.valves.keyword_prefix.lower()
+                )
+                for token in dispatch:
+                    automaton.add_word(f"{search_prefix}{token}", token)
+                automaton.make_automaton()
+                self.automaton = automaton
+                logger.debug(
+                    "[PATTERN COMPILER] Built Aho-Corasick automaton for %s commands",
+                    len(dispatch),
+                )
 
             self._last_compiled_config = current_config
-            print(f"[PATTERN COMPILER] Patterns compiled successfully")
+            self._compiled_personas_ref = available_personas
+            logger.debug("[PATTERN COMPILER] Patterns compiled successfully")
 
         except Exception as e:
-            print(f"[PATTERN COMPILER] Error compiling patterns: {e}")
+            logger.error("[PATTERN COMPILER] Error compiling patterns: %s", e)
             traceback.print_exc()
 
-    def get_persona_pattern(self, persona_key: str):
-        """Get or compile a pattern for a specific persona."""
-        if persona_key not in self.persona_patterns:
-            try:
-                prefix_escaped = re.escape(self.valves.keyword_prefix)
-                keyword_check = (
-                    persona_key if self.valves.case_sensitive else persona_key.lower()
-                )
-                flags = 0 if self.valves.case_sensitive else re.IGNORECASE
-                pattern_str = rf"{prefix_escaped}{re.escape(keyword_check)}\b"
-                self.persona_patterns[persona_key] = re.compile(pattern_str, flags)
-            except Exception as e:
-                print(
-                    f"[PATTERN COMPILER] Error compiling pattern for '{persona_key}': {e}"
-                )
-                return None
-
-        return self.persona_patterns[persona_key]
+    def invalidate(self):
+        """Force a recompile on the next detection (e.g. after valve changes)."""
+        self.combined_pattern = None
+        self.automaton = None
+        self.command_dispatch = {}
+        self._last_compiled_config = None
+        self._compiled_personas_ref = None
 
     def detect_keyword(
         self, message_content: str, available_personas: Dict
     ) -> Optional[str]:
-        """Efficiently detect persona keywords using pre-compiled patterns."""
+        """Efficiently detect persona keywords using the combined pattern."""
         if not message_content:
             return None
 
-        # Ensure patterns are up to date
-        self._compile_patterns()
+        # Fast path: no prefix character means no command - skip the
+        # lowercasing allocation and regex scan entirely. The scan is
+        # bounded: commands sit near the start, so a long paste should not
+        # cost a full-string sweep.
+        if (
+            message_content.find(
+                self.valves.keyword_prefix, 0, self.valves.max_scan_bytes
+            )
+            < 0
+        ):
+            return None
 
-        content_to_check = (
-            message_content if self.valves.case_sensitive else message_content.lower()
-        )
+        # Patterns are compiled on first use and whenever the persona
+        # mapping object changes (the cache hands out a stable view between
+        # reloads, so an identity check suffices on the hot path).
+        if (
+            self.combined_pattern is None
+            or available_personas is not self._compiled_personas_ref
+        ):
+            self._compile_patterns(available_personas)
+
+        if not self.combined_pattern:
+            return None
+
+        if self.automaton is not None:
+            return self._detect_with_automaton(message_content)
 
-        # Check list command (fastest check first)
-        if self.list_pattern and self.list_pattern.search(content_to_check):
-            return "list_personas"
+        # re.IGNORECASE on the compiled pattern handles case folding - no
+        # need to allocate a lowercased copy of the whole message. The scan
+        # is bounded to the leading window since commands appear at message
+        # start; long pasted content after that is never touched.
+        match = self.combined_pattern.search(
+            message_content, 0, self.valves.command_search_window
+        )
+        if not match:
+            return None
 
-        # Check reset commands
-        if self.reset_pattern and self.reset_pattern.search(content_to_check):
+        # Only the short matched span is case-folded - never the full
+        # message - before the canonical-key lookup
+        token = match.group("cmd")
+        if not self.valves.case_sensitive:
+            token = token.lower()
+        # Reset keywords resolve via O(1) set membership ahead of the
+        # persona dispatch lookup
+        if token in self.reset_keyword_set:
             return "reset"
+        return self.command_dispatch.get(token)
 
-        # Check download command
-        if self.download_pattern and self.download_pattern.search(content_to_check):
-            return "download_personas"
+    def _detect_with_automaton(self, message_content: str) -> Optional[str]:
+        """Single DFA pass over the command window for large keyword sets.
 
-        # Check persona commands
-        for persona_key in available_personas.keys():
-            pattern = self.get_persona_pattern(persona_key)
-            if pattern and pattern.search(content_to_check):
-                return persona_key
+        Mirrors the regex semantics: leftmost match wins, longer tokens
+        beat shorter ones at the same position, and the match must end at
+        a word boundary.
+        """
+        window = message_content[: self.valves.command_search_window]
+        if not self.valves.case_sensitive:
+            window = window.lower()
+
+        prefix_len = len(self.valves.keyword_prefix)
+        best = None
+        for end_index, token in self.automaton.iter(window):
+            next_index = end_index + 1
+            if next_index < len(window) and (
+                window[next_index].isalnum() or window[next_index] == "_"
+            ):
+                continue  # Not at a word boundary
+            start = end_index - prefix_len - len(token) + 1
+            candidate = (start, -len(token))
+            if best is None or candidate < best[0]:
+                best = (candidate, token)
 
-        return None
+        if best is None:
+            return None
+        token = best[1]
+        if token in self.reset_keyword_set:
+            return "reset"
+        return self.command_dispatch.get(token)
 
 
 class SmartPersonaCache:
@@ -597,68 +796,180 @@ class SmartPersonaCache:
 
     def __init__(self):
         self._cache = {}
-        self._file_mtime = 0
+        self._cache_view = types.MappingProxyType(self._cache)
+        self._file_signature = None
         self._validation_cache = {}
         self._last_filepath = None
+        self._last_validated_digest = None
+        # How long (ms) a warm cache may be served without re-statting the
+        # config file; the Filter syncs this from its valves on each load
+        self.stat_ttl_ms = 2000
+        self._last_stat_time = 0.0
+
+    def _within_stat_ttl(self, filepath: str, force_reload: bool) -> bool:
+        """Whether the warm cache can be served without touching the filesystem.
+
+        Coalesces the per-call os.stat into at most one syscall per TTL
+        window - config edits are rare, so a bounded staleness (default 2s)
+        trades nothing noticeable for a syscall-free hot path.
+        """
+        return (
+            not force_reload
+            and self.stat_ttl_ms > 0
+            and bool(self._cache)
+            and filepath == self._last_filepath
+            and (time.monotonic() - self._last_stat_time) * 1000.0 < self.stat_ttl_ms
+        )
+
+    def _stat_signature(self, filepath: str) -> Optional[tuple]:
+        """Stat the file once and return its change signature, or None if missing.
+
+        Nanosecond mtime plus size/inode catches edits within the same
+        second and file replacement.
+        """
+        try:
+            stat_result = os.stat(filepath)
+        except FileNotFoundError:
+            logger.debug("[SMART CACHE] File doesn't exist: %s", filepath)
+            return None
+        return (stat_result.st_mtime_ns, stat_result.st_size, stat_result.st_ino)
+
+    def _should_reload(
+        self, filepath: str, signature: tuple, force_reload: bool
+    ) -> bool:
+        """Decide whether the cached personas are stale for this file."""
+        filepath_changed = filepath != self._last_filepath
+        file_modified = signature != self._file_signature
+        needs_reload = (
+            force_reload or filepath_changed or file_modified or not self._cache
+        )
+        if needs_reload:
+            logger.debug("[SMART CACHE] Reloading personas from: %s", filepath)
+            logger.debug(
+                "[SMART CACHE] Reason - Force: %s, Path changed: %s, Modified: %s, Empty cache: %s",
+                force_reload,
+                filepath_changed,
+                file_modified,
+                not self._cache,
+            )
+        else:
+            logger.debug(
+                "[SMART CACHE] Using cached personas (%s personas)", len(self._cache)
+            )
+        return needs_reload
+
+    def _finish_load(
+        self, loaded_data: Dict, filepath: str, signature: tuple, raw_bytes: bytes
+    ) -> Dict:
+        """Validate freshly loaded data and cache it when valid.
+
+        Validation is memoized by a digest of the raw file bytes, so a
+        touched-but-unchanged file skips the full structural walk.
+        """
+        digest = hashlib.blake2b(raw_bytes, digest_size=16).digest()
+        if digest == self._last_validated_digest:
+            logger.debug(
+                "[SMART CACHE] Content digest unchanged - skipping re-validation"
+            )
+            validation_errors = []
+        else:
+            validation_errors = PersonaValidator.validate_personas_config(loaded_data)
+        if validation_errors:
+            logger.error("[SMART CACHE] Validation errors found:")
+            for error in validation_errors[:5]:  # Show first 5 errors
+                logger.error("[SMART CACHE]   - %s", error)
+            if len(validation_errors) > 5:
+                logger.error(
+                    "[SMART CACHE]   ... and %s more errors", len(validation_errors) - 5
+                )
+
+            # Don't cache invalid config, but still return it (graceful degradation)
+            return loaded_data
+
+        # Cache valid configuration
+        self._cache = loaded_data
+        self._cache_view = types.MappingProxyType(self._cache)
+        self._file_signature = signature
+        self._last_filepath = filepath
+        self._validation_cache[filepath] = True  # Mark as validated
+        self._last_validated_digest = digest
+
+        logger.debug("[SMART CACHE] Successfully cached %s personas", len(loaded_data))
+        return self._cache_view
 
     def get_personas(self, filepath: str, force_reload: bool = False) -> Dict:
         """Get personas with smart caching - only reload if file changed."""
         try:
-            # Check if file exists
-            if not os.path.exists(filepath):
-                print(f"[SMART CACHE] File doesn't exist: {filepath}")
+            if self._within_stat_ttl(filepath, force_reload):
+                return self._cache_view
+
+            signature = self._stat_signature(filepath)
+            self._last_stat_time = time.monotonic()
+            if signature is None:
                 return {}
 
-            # Check if we need to reload
-            current_mtime = os.path.getmtime(filepath)
-            filepath_changed = filepath != self._last_filepath
-            file_modified = current_mtime > self._file_mtime
+            if not self._should_reload(filepath, signature, force_reload):
+                # Read-only view prevents external modification without the
+                # per-call dict copy; callers needing to mutate take dict(view)
+                return self._cache_view
 
-            if force_reload or filepath_changed or file_modified or not self._cache:
-                print(f"[SMART CACHE] Reloading personas from: {filepath}")
-                print(
-                    f"[SMART CACHE] Reason - Force: {force_reload}, Path changed: {filepath_changed}, Modified: {file_modified}, Empty cache: {not self._cache}"
-                )
+            with open(filepath, "rb", buffering=65536) as f:
+                data = f.read()
+            loaded_data = _json_loads(data)
 
-                # Load from file
-                with open(filepath, "r", encoding="utf-8") as f:
-                    loaded_data = json.load(f)
+            return self._finish_load(loaded_data, filepath, signature, data)
 
-                # Validate configuration
-                validation_errors = PersonaValidator.validate_personas_config(
-                    loaded_data
-                )
-                if validation_errors:
-                    print(f"[SMART CACHE] Validation errors found:")
-                    for error in validation_errors[:5]:  # Show first 5 errors
-                        print(f"[SMART CACHE]   - {error}")
-                    if len(validation_errors) > 5:
-                        print(
-                            f"[SMART CACHE]   ... and {len(validation_errors) - 5} more errors"
-                        )
+        except json.JSONDecodeError as e:
+            logger.error("[SMART CACHE] JSON decode error in %s: %s", filepath, e)
+            return {}
+        except Exception as e:
+            logger.error(
+                "[SMART CACHE] Error loading personas from %s: %s", filepath, e
+            )
+            traceback.print_exc()
+            return {}
+
+    @staticmethod
+    def _read_file_bytes(filepath: str) -> bytes:
+        """Blocking file read, suitable for offloading to a worker thread."""
+        with open(filepath, "rb", buffering=65536) as f:
+            return f.read()
+
+    async def aget_personas(self, filepath: str, force_reload: bool = False) -> Dict:
+        """Async variant of get_personas for use inside the filter pipeline.
+
+        File I/O yields to the event loop (via aiofiles when available) and
+        JSON parsing runs in a worker thread, so a large personas file never
+        blocks other in-flight requests.
+        """
+        try:
+            if self._within_stat_ttl(filepath, force_reload):
+                return self._cache_view
 
-                    # Don't cache invalid config, but still return it (graceful degradation)
-                    return loaded_data
+            signature = self._stat_signature(filepath)
+            self._last_stat_time = time.monotonic()
+            if signature is None:
+                return {}
 
-                # Cache valid configuration
-                self._cache = loaded_data
-                self._file_mtime = current_mtime
-                self._last_filepath = filepath
-                self._validation_cache[filepath] = True  # Mark as validated
+            if not self._should_reload(filepath, signature, force_reload):
+                return self._cache_view
 
-                print(f"[SMART CACHE] Successfully cached {len(loaded_data)} personas")
+            if aiofiles is not None:
+                async with aiofiles.open(filepath, "rb") as f:
+                    data = await f.read()
             else:
-                print(
-                    f"[SMART CACHE] Using cached personas ({len(self._cache)} personas)"
-                )
+                data = await asyncio.to_thread(self._read_file_bytes, filepath)
+            loaded_data = await asyncio.to_thread(_json_loads, data)
 
-            return self._cache.copy()  # Return copy to prevent external modification
+            return self._finish_load(loaded_data, filepath, signature, data)
 
         except json.JSONDecodeError as e:
-            print(f"[SMART CACHE] JSON decode error in {filepath}: {e}")
+            logger.error("[SMART CACHE] JSON decode error in %s: %s", filepath, e)
             return {}
         except Exception as e:
-            print(f"[SMART CACHE] Error loading personas from {filepath}: {e}")
+            logger.error(
+                "[SMART CACHE] Error loading personas from %s: %s", filepath, e
+            )
             traceback.print_exc()
             return {}
 
@@ -670,9 +981,11 @@ class SmartPersonaCache:
         """Force cache invalidation on next access."""
         self._cache.clear()
         self._validation_cache.clear()
-        self._file_mtime = 0
+        self._file_signature = None
         self._last_filepath = None
-        print("[SMART CACHE] Cache invalidated")
+        self._last_validated_digest = None
+        self._last_stat_time = 0.0
+        logger.debug("[SMART CACHE] Cache invalidated")
 
 
 class Filter:
@@ -700,6 +1013,18 @@ class Filter:
         case_sensitive: bool = Field(
             default=False, description="Whether keyword matching is case-sensitive"
         )
+        command_search_window: int = Field(
+            default=512,
+            description="Number of leading characters scanned for persona commands (commands appear at the start of a message)",
+        )
+        max_scan_bytes: int = Field(
+            default=8192,
+            description="Number of leading characters checked for the keyword prefix before any detection work runs",
+        )
+        persona_config_stat_ttl_ms: int = Field(
+            default=2000,
+            description="How long (ms) cached personas are served without re-checking the config file on disk. 0 disables the TTL.",
+        )
         show_persona_info: bool = Field(
             default=True,
             description="Show persona information when switching (UI status messages)",
@@ -741,6 +1066,47 @@ class Filter:
     def __init__(self):
         self.valves = self.Valves()
         self.toggle = True
+
+        # Debug logging is gated by the logger level, so disabled-level
+        # calls skip message formatting entirely
+        logger.setLevel(
+            logging.DEBUG if self.valves.debug_performance else logging.INFO
+        )
+        # Snapshot of the debug valve for hot-path checks - one attribute
+        # read instead of two per instrumented call
+        self._debug = self.valves.debug_performance
+
+        # Filepath cache - rebuilt only when the relevant valves change
+        self._cached_filepath = None
+        self._cached_filepath_key = None
+
+        # Rendered !list output, reusable until personas or the relevant
+        # valves change (the cache hands out a stable mapping between reloads)
+        self._cached_list_prompt = None
+        self._cached_persona_list_str = None
+        self._list_cache_personas = None
+        self._list_cache_valves = None
+
+        # Parsed reset keywords and their display string, keyed on the
+        # valves they derive from
+        self._reset_display_key = None
+        self._reset_keywords_list = []
+        self._reset_cmds_display_str = ""
+
+        # Intro segments parsed out of persona prompts, memoized per
+        # persona until the mapping reloads
+        self._intro_cache_personas = None
+        self._intro_segments = {}
+
+        # Prefix-agnostic !list prompt template; survives prefix valve
+        # tweaks so only the placeholder substitution reruns
+        self._list_prompt_template = None
+        self._list_template_key = None
+
+        # Compiled command-removal patterns, keyed by command and
+        # invalidated when the relevant valves change
+        self._compiled_removers = {}
+        self._removers_signature = None
         self.icon = """data:image/svg+xml;base64,PHN2ZyB4bWxucz0iaHR0cDovL3d3dy53My5vcmcvMjAwMC9zdmciIGZpbGw9Im5vbmUiIHZpZXdCb3g9IjAgMCAyNCAyNCIgc3Ryb2tlLXdpZHRoPSIxLjUiIHN0cm9rZT0iY3VycmVudENvbG9yIj4KICA8cGF0aCBzdHJva2UtbGluZWNhcD0icm91bmQiIHN0cm9rZS1saW5lam9pbj0icm91bmQiIGQ9Ik0xNS43NSA1QzE1Ljc1IDMuMzQzIDE0LjQwNyAyIDEyLjc1IDJTOS43NSAzLjM0MyA5Ljc1IDV2MC41QTMuNzUgMy43NSAwIDAgMCAxMy41IDkuMjVjMi4xIDAgMy44MS0xLjc2NyAzLjc1LTMuODZWNVoiLz4KICA8cGF0aCBzdHJva2UtbGluZWNhcD0icm91bmQiIHN0cm9rZS1saW5lam9pbj0icm91bmQiIGQ9Ik04LjI1IDV2LjVhMy43NSAzLjc1IDAgMCAwIDMuNzUgMy43NWMuNzE0IDAgMS4zODUtLjIgMS45Ni0uNTU2QTMuNzUgMy43NSAwIDAgMCAxNy4yNSA1djAuNUMxNy4yNSAzLjM0MyAxNS45MDcgMiAxNC4yNSAyczMuNzUgMS4zNDMgMy43NSAzdjAuNUEzLjc1IDMuNzUgMCAwIDAgMjEuNzUgOWMuNzE0IDAgMS4zODUtLjIgMS45Ni0uNTU2QTMuNzUgMy43NSAwIDAgMCAyMS4yNSA1djAuNSIvPgo8L3N2Zz4="""
 
         # State management
@@ -748,6 +1114,18 @@ class Filter:
         self.was_toggled_off_last_call = False
         self.active_status_message_id = None
         self.event_emitter_for_close_task = None
+        # Monotonic sequence for status message IDs; the pid keeps IDs
+        # unique across restarts without hashing the description text
+        self._status_msg_seq = 0
+        self._status_msg_id_prefix = f"persona_status_{os.getpid()}"
+
+        # Pending status-message closes share one pump task and one timer
+        # instead of spawning a task-plus-sleep per emit; superseded IDs
+        # are dropped from the queue without waiting out their deadline
+        self._close_heap = []
+        self._stale_close_ids = set()
+        self._close_wakeup = None
+        self._close_pump_task = None
 
         # Performance optimization components
         self.pattern_compiler = PatternCompiler(self.valves)
@@ -755,7 +1133,7 @@ class Filter:
 
         # Download system
         self.download_manager = PersonaDownloadManager(
-            self.valves, self._get_config_filepath
+            self.valves, self._get_config_filepath, self.persona_cache
         )
 
         # Initialize config file if it doesn't exist
@@ -771,11 +1149,19 @@ class Filter:
         """Constructs the config file path within the tool's cache directory.
 
         Creates path: /app/backend/data/cache/functions/agent_hotswap/personas.json
+
+        The joined path is cached and only rebuilt when the directory or
+        filename valves change.
         """
-        base_cache_dir = "/app/backend/data/cache/functions"
-        target_dir = os.path.join(base_cache_dir, self.valves.cache_directory_name)
-        filepath = os.path.join(target_dir, self.valves.config_filename)
-        return filepath
+        filepath_key = (self.valves.cache_directory_name, self.valves.config_filename)
+        if filepath_key != self._cached_filepath_key:
+            base_cache_dir = "/app/backend/data/cache/functions"
+            target_dir = os.path.join(base_cache_dir, self.valves.cache_directory_name)
+            self._cached_filepath = os.path.join(
+                target_dir, self.valves.config_filename
+            )
+            self._cached_filepath_key = filepath_key
+        return self._cached_filepath
 
     def get_master_controller_persona(self) -> Dict:
         """Returns the master controller persona - always active foundation."""
@@ -859,98 +1245,103 @@ Leverage these capabilities appropriately - use LaTeX for math, Mermaid for diag
         return personas
 
     def _write_config_to_json(self, config_data: Dict, filepath: str) -> str:
-        """Writes the configuration data to a JSON file."""
+        """Writes the configuration data to a JSON file.
+
+        Skips the disk write entirely when the serialized content matches
+        what is already on disk (so the mtime-based cache isn't needlessly
+        invalidated), and writes atomically via a temp file otherwise.
+        """
         try:
-            print(
-                f"[PERSONA CONFIG] Attempting to create target directory if not exists: {os.path.dirname(filepath)}"
+            logger.debug(
+                "[PERSONA CONFIG] Attempting to create target directory if not exists: %s",
+                os.path.dirname(filepath),
             )
             os.makedirs(os.path.dirname(filepath), exist_ok=True)
 
-            print(f"[PERSONA CONFIG] Writing personas config to: {filepath}")
-            with open(filepath, "w", encoding="utf-8") as f:
-                json.dump(config_data, f, indent=4, ensure_ascii=False)
+            new_bytes = _json_dumps_bytes(config_data)
+
+            stat_result = _stat_or_none(filepath)
+            if stat_result is not None and stat_result.st_size == len(new_bytes):
+                with open(filepath, "rb") as f:
+                    on_disk_digest = hashlib.blake2b(f.read(), digest_size=16).digest()
+                new_digest = hashlib.blake2b(new_bytes, digest_size=16).digest()
+                if on_disk_digest == new_digest:
+                    logger.debug(
+                        "[PERSONA CONFIG] Content unchanged, skipping write to: %s",
+                        filepath,
+                    )
+                    return f"Successfully verified personas config (unchanged) at {filepath}"
+
+            logger.debug("[PERSONA CONFIG] Writing personas config to: %s", filepath)
+            temp_filepath = f"{filepath}.tmp"
+            with open(temp_filepath, "wb") as f:
+                f.write(new_bytes)
+            os.replace(temp_filepath, filepath)
 
-            print(f"[PERSONA CONFIG] SUCCESS: Config file written to: {filepath}")
+            logger.debug(
+                "[PERSONA CONFIG] SUCCESS: Config file written to: %s", filepath
+            )
             return f"Successfully wrote personas config to {os.path.basename(filepath)} at {filepath}"
 
         except Exception as e:
             error_message = (
                 f"Error writing personas config to {os.path.basename(filepath)}: {e}"
             )
-            print(f"[PERSONA CONFIG] ERROR: {error_message}")
+            logger.error("[PERSONA CONFIG] ERROR: %s", error_message)
             traceback.print_exc()
             return error_message
 
-    def _read_config_from_json(self, filepath: str) -> Dict:
-        """Reads the configuration data from a JSON file."""
-        try:
-            if not os.path.exists(filepath):
-                print(f"[PERSONA CONFIG] Config file does not exist: {filepath}")
-                return {}
-
-            print(f"[PERSONA CONFIG] Reading personas config from: {filepath}")
-            with open(filepath, "r", encoding="utf-8") as f:
-                data = json.load(f)
-
-            print(
-                f"[PERSONA CONFIG] Successfully loaded {len(data)} personas from config file"
-            )
-            return data
-
-        except json.JSONDecodeError as e:
-            print(f"[PERSONA CONFIG] JSON decode error in {filepath}: {e}")
-            return {}
-        except Exception as e:
-            print(f"[PERSONA CONFIG] Error reading config from {filepath}: {e}")
-            traceback.print_exc()
-            return {}
-
     def _ensure_config_file_exists(self):
         """Creates the default config file if it doesn't exist."""
-        if not os.path.exists(self.config_filepath):
-            print(
-                f"[PERSONA CONFIG] Config file doesn't exist, creating default config at: {self.config_filepath}"
+        if _stat_or_none(self.config_filepath) is None:
+            logger.debug(
+                "[PERSONA CONFIG] Config file doesn't exist, creating default config at: %s",
+                self.config_filepath,
             )
             default_personas = self._get_default_personas()
             result = self._write_config_to_json(default_personas, self.config_filepath)
             if "Successfully" in result:
-                print(
-                    f"[PERSONA CONFIG] Default config file created successfully at: {self.config_filepath}"
+                logger.debug(
+                    "[PERSONA CONFIG] Default config file created successfully at: %s",
+                    self.config_filepath,
                 )
             else:
-                print(
-                    f"[PERSONA CONFIG] Failed to create default config file: {result}"
+                logger.error(
+                    "[PERSONA CONFIG] Failed to create default config file: %s", result
                 )
         else:
-            print(
-                f"[PERSONA CONFIG] Config file already exists at: {self.config_filepath}"
+            logger.debug(
+                "[PERSONA CONFIG] Config file already exists at: %s",
+                self.config_filepath,
             )
 
     def _debug_log(self, message: str):
-        """Log debug information if performance debugging is enabled."""
-        if self.valves.debug_performance:
-            print(f"[PERFORMANCE DEBUG] {message}")
+        """Log debug information; gated by the logger level."""
+        logger.debug("[PERFORMANCE DEBUG] %s", message)
 
     def _load_personas(self) -> Dict:
         """Loads personas from the external JSON config file with smart caching."""
-        start_time = time.time() if self.valves.debug_performance else 0
+        start_time = time.time() if self._debug else 0
 
         current_config_path = self.config_filepath
 
         try:
             # Use smart cache for efficient loading
+            self.persona_cache.stat_ttl_ms = self.valves.persona_config_stat_ttl_ms
             loaded_personas = self.persona_cache.get_personas(current_config_path)
 
             # If file is empty or doesn't exist, use defaults
             if not loaded_personas:
-                print("[PERSONA CONFIG] Using default personas (file empty or missing)")
+                logger.debug(
+                    "[PERSONA CONFIG] Using default personas (file empty or missing)"
+                )
                 loaded_personas = self._get_default_personas()
 
                 # Optionally write defaults to file
                 if self.valves.create_default_config:
                     self._write_config_to_json(loaded_personas, current_config_path)
 
-            if self.valves.debug_performance:
+            if self._debug:
                 elapsed = (time.time() - start_time) * 1000
                 self._debug_log(
                     f"_load_personas completed in {elapsed:.2f}ms ({len(loaded_personas)} personas)"
@@ -959,8 +1350,10 @@ Leverage these capabilities appropriately - use LaTeX for math, Mermaid for diag
             return loaded_personas
 
         except Exception as e:
-            print(
-                f"[PERSONA CONFIG] Error loading personas from {current_config_path}: {e}"
+            logger.error(
+                "[PERSONA CONFIG] Error loading personas from %s: %s",
+                current_config_path,
+                e,
             )
             # Fallback to minimal default
             return {
@@ -971,20 +1364,84 @@ Leverage these capabilities appropriately - use LaTeX for math, Mermaid for diag
                 }
             }
 
-    def _detect_persona_keyword(self, message_content: str) -> Optional[str]:
+    async def _aload_personas(self) -> Dict:
+        """Async variant of _load_personas for the inlet hot path.
+
+        Uses the cache's cooperative loader so config reads never block the
+        event loop; falls back to the same defaults as the sync version.
+        """
+        start_time = time.time() if self._debug else 0
+
+        current_config_path = self.config_filepath
+
+        try:
+            self.persona_cache.stat_ttl_ms = self.valves.persona_config_stat_ttl_ms
+            loaded_personas = await self.persona_cache.aget_personas(
+                current_config_path
+            )
+
+            # If file is empty or doesn't exist, use defaults
+            if not loaded_personas:
+                logger.debug(
+                    "[PERSONA CONFIG] Using default personas (file empty or missing)"
+                )
+                loaded_personas = self._get_default_personas()
+
+                # Optionally write defaults to file
+                if self.valves.create_default_config:
+                    self._write_config_to_json(loaded_personas, current_config_path)
+
+            if self._debug:
+                elapsed = (time.time() - start_time) * 1000
+                self._debug_log(
+                    f"_aload_personas completed in {elapsed:.2f}ms ({len(loaded_personas)} personas)"
+                )
+
+            return loaded_personas
+
+        except Exception as e:
+            logger.error(
+                "[PERSONA CONFIG] Error loading personas from %s: %s",
+                current_config_path,
+                e,
+            )
+            # Fallback to minimal default
+            return {
+                "coder": {
+                    "name": "💻 Code Assistant",
+                    "prompt": "You are a helpful coding assistant.",
+                    "description": "Programming help",
+                }
+            }
+
+    def _detect_persona_keyword(
+        self, message_content: str, personas: Optional[Dict] = None
+    ) -> Optional[str]:
         """Efficiently detect persona keywords using pre-compiled patterns."""
-        start_time = time.time() if self.valves.debug_performance else 0
+        start_time = time.time() if self._debug else 0
 
         if not message_content:
             return None
 
-        # Load available personas for pattern matching
-        personas = self._load_personas()
+        # Dominant case: no prefix anywhere near the start means no command,
+        # so one C-level substring scan replaces all detection work below
+        if (
+            message_content.find(
+                self.valves.keyword_prefix, 0, self.valves.max_scan_bytes
+            )
+            < 0
+        ):
+            return None
+
+        # Load available personas for pattern matching (callers that already
+        # hold the mapping pass it in to avoid a redundant cache hit)
+        if personas is None:
+            personas = self._load_personas()
 
         # Use optimized pattern compiler for detection
         result = self.pattern_compiler.detect_keyword(message_content, personas)
 
-        if self.valves.debug_performance:
+        if self._debug:
             elapsed = (time.time() - start_time) * 1000
             self._debug_log(
                 f"_detect_persona_keyword completed in {elapsed:.2f}ms (result: {result})"
@@ -992,9 +1449,12 @@ Leverage these capabilities appropriately - use LaTeX for math, Mermaid for diag
 
         return result
 
-    def _create_persona_system_message(self, persona_key: str) -> Dict:
+    def _create_persona_system_message(
+        self, persona_key: str, personas: Optional[Dict] = None
+    ) -> Dict:
         """Enhanced system message that ALWAYS includes master controller + selected persona."""
-        personas = self._load_personas()
+        if personas is None:
+            personas = self._load_personas()
 
         # ALWAYS start with master controller (unless we're resetting)
         master_controller = personas.get("_master_controller", {})
@@ -1009,39 +1469,68 @@ Leverage these capabilities appropriately - use LaTeX for math, Mermaid for diag
         # Combine: Master Controller + Selected Persona
         system_content = f"{master_prompt}\n\n{persona_prompt}"
 
+        # The header doubles as the marker downstream passes use to
+        # recognize (and replace) this message, so it must be present even
+        # when a custom config ships no _master_controller prompt
+        if not system_content.startswith("=== OPENWEBUI MASTER CONTROLLER ==="):
+            system_content = (
+                f"=== OPENWEBUI MASTER CONTROLLER ===\n{system_content.lstrip()}"
+            )
+
         # Add persona indicator (but NOT for master controller)
         if self.valves.show_persona_info and persona_key != "_master_controller":
             persona_name = persona.get("name", persona_key.title())
             system_content += f"\n\n🎭 **Active Persona**: {persona_name}"
 
+        # No custom keys here: the body ships to the backend as-is, and
+        # strict OpenAI-compatible APIs reject unknown message properties.
+        # Downstream passes identify this message by its marker prefix.
         return {"role": "system", "content": system_content}
 
-    def _remove_keyword_from_message(self, content: str, keyword_found: str) -> str:
-        prefix = re.escape(self.valves.keyword_prefix)
-        flags = 0 if self.valves.case_sensitive else re.IGNORECASE
+    def _get_remover_pattern(self, keyword_found: str) -> "re.Pattern":
+        """Get a cached compiled pattern that strips the given command.
 
-        if keyword_found == "reset":
-            reset_keywords_list = [
-                word.strip() for word in self.valves.reset_keywords.split(",")
-            ]
-            for r_keyword in reset_keywords_list:
-                pattern_to_remove = rf"{prefix}{re.escape(r_keyword)}\b\s*"
-                content = re.sub(pattern_to_remove, "", content, flags=flags)
-        elif keyword_found == "list_personas":
-            list_cmd_keyword_to_remove = self.valves.list_command_keyword
-            pattern_to_remove = rf"{prefix}{re.escape(list_cmd_keyword_to_remove)}\b\s*"
-            content = re.sub(pattern_to_remove, "", content, flags=flags)
-        elif keyword_found == "download_personas":
-            # Handle download personas command
-            pattern_to_remove = rf"{prefix}{re.escape(keyword_found)}\b\s*"
-            content = re.sub(pattern_to_remove, "", content, flags=flags)
-        else:
-            # Handle persona switching commands
-            keyword_to_remove_escaped = re.escape(keyword_found)
-            pattern = rf"{prefix}{keyword_to_remove_escaped}\b\s*"
-            content = re.sub(pattern, "", content, flags=flags)
+        Patterns are compiled once per (prefix, case, keywords) valve
+        signature; the reset command uses a single alternation instead of
+        one pattern per reset keyword.
+        """
+        remover_signature = (
+            self.valves.keyword_prefix,
+            self.valves.case_sensitive,
+            self.valves.reset_keywords,
+            self.valves.list_command_keyword,
+        )
+        if remover_signature != self._removers_signature:
+            self._compiled_removers = {}
+            self._removers_signature = remover_signature
+
+        pattern = self._compiled_removers.get(keyword_found)
+        if pattern is None:
+            prefix = re.escape(self.valves.keyword_prefix)
+            flags = 0 if self.valves.case_sensitive else re.IGNORECASE
+
+            if keyword_found == "reset":
+                reset_alternation = "|".join(
+                    re.escape(word.strip())
+                    for word in self.valves.reset_keywords.split(",")
+                    if word.strip()
+                )
+                pattern_str = rf"{prefix}(?:{reset_alternation})\b\s*"
+            elif keyword_found == "list_personas":
+                pattern_str = (
+                    rf"{prefix}{re.escape(self.valves.list_command_keyword)}\b\s*"
+                )
+            else:
+                # Persona switching commands and download_personas
+                pattern_str = rf"{prefix}{re.escape(keyword_found)}\b\s*"
+
+            pattern = re.compile(pattern_str, flags)
+            self._compiled_removers[keyword_found] = pattern
 
-        return content.strip()
+        return pattern
+
+    def _remove_keyword_from_message(self, content: str, keyword_found: str) -> str:
+        return self._get_remover_pattern(keyword_found).sub("", content).strip()
 
     async def _emit_and_schedule_close(
         self,
@@ -1052,7 +1541,12 @@ Leverage these capabilities appropriately - use LaTeX for math, Mermaid for diag
         if not emitter or not self.valves.show_persona_info:
             return
 
-        message_id = f"persona_status_{int(time.time() * 1000)}_{hash(description)}"
+        self._status_msg_seq += 1
+        message_id = f"{self._status_msg_id_prefix}_{self._status_msg_seq}"
+        if self.active_status_message_id is not None:
+            # Cancel the superseded close eagerly - its queue entry is
+            # discarded instead of ticking down to a suppressed emit
+            self._stale_close_ids.add(self.active_status_message_id)
         self.active_status_message_id = message_id
         self.event_emitter_for_close_task = emitter
 
@@ -1069,10 +1563,60 @@ Leverage these capabilities appropriately - use LaTeX for math, Mermaid for diag
             },
         }
         await emitter(status_message)
-        asyncio.create_task(self._try_close_message_after_delay(message_id))
+        self._schedule_close(message_id)
+
+    def _schedule_close(self, message_id: str):
+        """Queue a status message for auto-close on the shared pump task."""
+        close_at = (
+            time.monotonic() + self.valves.status_message_auto_close_delay_ms / 1000.0
+        )
+        heapq.heappush(self._close_heap, (close_at, message_id))
+        if self._close_wakeup is None:
+            self._close_wakeup = asyncio.Event()
+        self._close_wakeup.set()
+        if self._close_pump_task is None or self._close_pump_task.done():
+            self._close_pump_task = asyncio.create_task(self._close_pump())
+
+    async def _close_pump(self):
+        """Single long-lived task draining all scheduled status closes.
+
+        One timer amortized across every pending close: sleep until the
+        earliest deadline (or an earlier wakeup when a new close is pushed),
+        then close everything that is due. Exits when the queue drains and
+        is respawned lazily by the next emit.
+        """
+        while self._close_heap:
+            close_at, message_id = self._close_heap[0]
+            if message_id in self._stale_close_ids:
+                heapq.heappop(self._close_heap)
+                self._stale_close_ids.discard(message_id)
+                continue
+            delay = close_at - time.monotonic()
+            if delay > 0:
+                self._close_wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._close_wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            heapq.heappop(self._close_heap)
+            await self._try_close_message(message_id)
 
-    async def _try_close_message_after_delay(self, message_id_to_close: str):
-        await asyncio.sleep(self.valves.status_message_auto_close_delay_ms / 1000.0)
+    def __del__(self):
+        task = getattr(self, "_close_pump_task", None)
+        if task is not None and not task.done():
+            task.cancel()
+
+    async def _emit_all(self, emissions: List[Any]):
+        """Await multiple emitter coroutines concurrently.
+
+        Overlaps the frontend round-trips instead of serializing them;
+        exceptions from individual emits are contained.
+        """
+        if emissions:
+            await asyncio.gather(*emissions, return_exceptions=True)
+
+    async def _try_close_message(self, message_id_to_close: str):
         if (
             self.event_emitter_for_close_task
             and self.active_status_message_id == message_id_to_close
@@ -1091,71 +1635,195 @@ Leverage these capabilities appropriately - use LaTeX for math, Mermaid for diag
             try:
                 await self.event_emitter_for_close_task(update_message)
             except Exception as e:
-                print(f"Error sending update_message for close: {e}")
+                logger.error("Error sending update_message for close: %s", e)
             self.active_status_message_id = None
             self.event_emitter_for_close_task = None
 
-    def _find_last_user_message(self, messages: List[Dict]) -> tuple[int, str]:
-        """Find the last user message in the conversation.
+    def _find_last_user_message(self, messages: List[Dict]) -> int:
+        """Find the index of the last user message, or -1 if none exists.
 
-        Returns:
-            tuple: (index, content) of last user message, or (-1, "") if none found
+        Only the index is returned; callers fetch the content themselves
+        when (and if) they actually need it.
         """
-        for i in range(len(messages) - 1, -1, -1):
+        # Fast path: in OpenAI-style chat the last element is almost always
+        # the user turn, so the common case is O(1)
+        if messages:
+            if messages[-1].get("role") == "user":
+                return len(messages) - 1
+        for i in range(len(messages) - 2, -1, -1):
             if messages[i].get("role") == "user":
-                return i, messages[i].get("content", "")
-        return -1, ""
+                return i
+        return -1
+
+    @staticmethod
+    def _is_persona_system_message(msg: Dict) -> bool:
+        """Identify system messages injected by this filter.
+
+        A cheap role check plus a prefix comparison on the marker bytes
+        covers messages we created; the full content scan only runs for
+        messages missing the master-controller header.
+        """
+        if msg.get("role") != "system":
+            return False
+        content = msg.get("content", "")
+        if content.startswith("=== OPENWEBUI MASTER CONTROLLER ==="):
+            return True
+        return "🎭 **Active Persona**" in content
 
     def _remove_persona_system_messages(self, messages: List[Dict]) -> List[Dict]:
-        """Remove existing persona system messages (including master controller)."""
-        return [
-            msg
-            for msg in messages
-            if not (
-                msg.get("role") == "system"
-                and (
-                    "🎭 **Active Persona**" in msg.get("content", "")
-                    or "=== OPENWEBUI MASTER CONTROLLER ===" in msg.get("content", "")
-                )
+        """Remove existing persona system messages (including master controller).
+
+        Returns the input list untouched when nothing needs removing - the
+        common case - so no copy is allocated; any() stops at the first hit.
+        """
+        if not any(self._is_persona_system_message(msg) for msg in messages):
+            return messages
+        return [msg for msg in messages if not self._is_persona_system_message(msg)]
+
+    def _rewrite_messages(
+        self,
+        messages: List[Dict],
+        *,
+        target_user_content: Optional[str] = None,
+        new_user_content: Optional[str] = None,
+        prepend_sys: Optional[Dict] = None,
+    ) -> List[Dict]:
+        """Single-pass message rewrite shared by the command handlers.
+
+        One walk drops persona system messages, rewrites the first user
+        message matching target_user_content (copy-on-write), and places
+        prepend_sys at the front - instead of each handler running its own
+        traversal with its own intermediate lists.
+        """
+        rewritten = [prepend_sys] if prepend_sys is not None else []
+        user_rewritten = target_user_content is None
+        for msg in messages:
+            if self._is_persona_system_message(msg):
+                continue
+            if (
+                not user_rewritten
+                and msg.get("role") == "user"
+                and msg.get("content", "") == target_user_content
+            ):
+                msg = dict(msg)
+                msg["content"] = new_user_content
+                user_rewritten = True
+            rewritten.append(msg)
+        return rewritten
+
+    @staticmethod
+    def _parse_intro_segment(prompt: Optional[str]) -> Optional[str]:
+        """Extract the \"When introducing yourself, ...\" fragment of a prompt."""
+        intro_marker = "When introducing yourself,"
+        if not prompt or intro_marker not in prompt:
+            return None
+        try:
+            segment = prompt.split(intro_marker, 1)[1].split(".", 1)[0].strip()
+        except IndexError:
+            return None
+        return segment or None
+
+    def _get_intro_segment(
+        self, persona_key: str, persona_config: Dict, personas: Dict
+    ) -> Optional[str]:
+        """Memoized intro segment - depends only on the persona config,
+        so it is parsed once per persona per config reload rather than on
+        every switch."""
+        if personas is not self._intro_cache_personas:
+            self._intro_cache_personas = personas
+            self._intro_segments = {}
+        if persona_key not in self._intro_segments:
+            self._intro_segments[persona_key] = self._parse_intro_segment(
+                persona_config.get("prompt")
             )
-        ]
+        return self._intro_segments[persona_key]
+
+    def _reset_cmds_display(self) -> str:
+        """Cached \"`!reset`, `!default`, ...\" display string for list output."""
+        display_key = (self.valves.keyword_prefix, self.valves.reset_keywords)
+        if display_key != self._reset_display_key:
+            self._reset_keywords_list = [
+                rk.strip() for rk in self.valves.reset_keywords.split(",") if rk.strip()
+            ]
+            self._reset_cmds_display_str = ", ".join(
+                f"`{self.valves.keyword_prefix}{rk}`"
+                for rk in self._reset_keywords_list
+            )
+            self._reset_display_key = display_key
+        return self._reset_cmds_display_str
+
+    def _refresh_list_cache(self, personas: Dict) -> None:
+        """Drop cached !list renderings when personas or valves change.
+
+        Identity check on the mapping (the cache view is stable between
+        reloads) plus the valves the rendered strings depend on.
+        """
+        valves_signature = (
+            self.valves.keyword_prefix,
+            self.valves.reset_keywords,
+            self.valves.list_command_keyword,
+        )
+        if (
+            personas is not self._list_cache_personas
+            or valves_signature != self._list_cache_valves
+        ):
+            self._list_cache_personas = personas
+            self._list_cache_valves = valves_signature
+            self._cached_list_prompt = None
+            self._cached_persona_list_str = None
+
+    # Sentinel substituted for the keyword prefix in the cached !list
+    # template; NUL-delimited so it cannot collide with persona content
+    _PREFIX_PLACEHOLDER = "\x00prefix\x00"
+
+    def _build_list_prompt_template(self, personas: Dict) -> str:
+        """Render the !list prompt with a placeholder where the prefix goes.
+
+        The expensive part (sorting, row formatting) depends only on the
+        persona set and reset keywords, so the template survives prefix
+        valve tweaks - only the placeholder substitution reruns.
+        """
+        template_key = (personas, self.valves.reset_keywords)
+        if (
+            self._list_prompt_template is not None
+            and self._list_template_key is not None
+            and personas is self._list_template_key[0]
+            and self.valves.reset_keywords == self._list_template_key[1]
+        ):
+            return self._list_prompt_template
 
-    def _generate_persona_table(self, personas: Dict) -> str:
-        """Generate markdown table for persona list command (excludes master controller)."""
         # Filter out master controller from display
         display_personas = {
             k: v for k, v in personas.items() if k != "_master_controller"
         }
 
         sorted_persona_keys = sorted(display_personas.keys())
-        table_rows_str_list = []
         items_per_row_pair = 2
+        prefix = self._PREFIX_PLACEHOLDER
 
-        for i in range(0, len(sorted_persona_keys), items_per_row_pair):
+        def format_row(start: int) -> str:
             row_cells = []
-            for j in range(items_per_row_pair):
-                if i + j < len(sorted_persona_keys):
-                    key = sorted_persona_keys[i + j]
-                    data = display_personas[key]
-                    command = f"`{self.valves.keyword_prefix}{key}`"
-                    name = data.get("name", key.title())
-                    row_cells.extend([command, name])
-                else:
-                    row_cells.extend([" ", " "])  # Empty cells for better rendering
-            table_rows_str_list.append(f"| {' | '.join(row_cells)} |")
-
-        table_data_str = "\n".join(table_rows_str_list)
+            for key in sorted_persona_keys[start : start + items_per_row_pair]:
+                data = display_personas[key]
+                row_cells.extend((f"`{prefix}{key}`", data.get("name", key.title())))
+            while len(row_cells) < items_per_row_pair * 2:
+                row_cells.extend((" ", " "))  # Empty cells for better rendering
+            return f"| {' | '.join(row_cells)} |"
+
+        table_data_str = "\n".join(
+            format_row(i)
+            for i in range(0, len(sorted_persona_keys), items_per_row_pair)
+        )
         headers = " | ".join(["Command", "Name"] * items_per_row_pair)
         separators = " | ".join(["---|---"] * items_per_row_pair)
 
-        # Prepare reset commands string
-        reset_cmds_formatted = [
-            f"`{self.valves.keyword_prefix}{rk.strip()}`"
+        reset_cmds_str = ", ".join(
+            f"`{prefix}{rk.strip()}`"
             for rk in self.valves.reset_keywords.split(",")
-        ]
-        reset_cmds_str = ", ".join(reset_cmds_formatted)
+            if rk.strip()
+        )
 
-        return (
+        self._list_prompt_template = (
             f"Please present the following information. First, a Markdown table of available persona commands, "
             f"titled '**Available Personas**'. The table should have columns for 'Command' and 'Name', "
             f"displaying two pairs of these per row.\n\n"
@@ -1167,6 +1835,23 @@ Leverage these capabilities appropriately - use LaTeX for math, Mermaid for diag
             f"To revert to the default assistant, use one of these commands: {reset_cmds_str}\n\n"
             f"Ensure the output is only the Markdown table with its title, followed by the reset instructions, all correctly formatted."
         )
+        self._list_template_key = template_key
+        return self._list_prompt_template
+
+    def _generate_persona_table(self, personas: Dict) -> str:
+        """Generate markdown table for persona list command (excludes master controller).
+
+        Served from cache between reloads; on a prefix-only valve change
+        just the placeholder substitution over the cached template reruns.
+        """
+        self._refresh_list_cache(personas)
+        if self._cached_list_prompt is not None:
+            return self._cached_list_prompt
+
+        self._cached_list_prompt = self._build_list_prompt_template(personas).replace(
+            self._PREFIX_PLACEHOLDER, self.valves.keyword_prefix
+        )
+        return self._cached_list_prompt
 
     async def _handle_toggle_off_state(
         self, body: Dict, __event_emitter__: Callable[[dict], Any]
@@ -1221,19 +1906,21 @@ Leverage these capabilities appropriately - use LaTeX for math, Mermaid for diag
         # Parse command
         parsed = self._parse_download_command(original_content)
 
-        # Status: Starting download
-        await self._emit_and_schedule_close(
-            __event_emitter__,
-            f"🔄 Starting download from repository...",
-            status_type="in_progress",
-        )
-
-        # Status: Validating URL
+        # Status: starting download and validating URL - emitted together
         download_url = parsed["url"] or self.valves.default_personas_repo
-        await self._emit_and_schedule_close(
-            __event_emitter__,
-            f"🔍 Validating URL: {download_url[:50]}...",
-            status_type="in_progress",
+        await self._emit_all(
+            [
+                self._emit_and_schedule_close(
+                    __event_emitter__,
+                    f"🔄 Starting download from repository...",
+                    status_type="in_progress",
+                ),
+                self._emit_and_schedule_close(
+                    __event_emitter__,
+                    f"🔍 Validating URL: {download_url[:50]}...",
+                    status_type="in_progress",
+                ),
+            ]
         )
 
         # Download and apply personas in one step
@@ -1275,15 +1962,14 @@ Leverage these capabilities appropriately - use LaTeX for math, Mermaid for diag
 
         # Directly invalidate caches to reload new config
         try:
-            print("[DOWNLOAD] Clearing caches to reload new configuration...")
+            logger.debug("[DOWNLOAD] Clearing caches to reload new configuration...")
             if hasattr(self, "persona_cache") and self.persona_cache:
                 self.persona_cache.invalidate_cache()
             if hasattr(self, "pattern_compiler") and self.pattern_compiler:
-                self.pattern_compiler._last_compiled_config = None
-                self.pattern_compiler.persona_patterns.clear()
-            print("[DOWNLOAD] Caches cleared successfully")
+                self.pattern_compiler.invalidate()
+            logger.debug("[DOWNLOAD] Caches cleared successfully")
         except Exception as cache_error:
-            print(f"[DOWNLOAD] Warning: Cache clearing failed: {cache_error}")
+            logger.warning("[DOWNLOAD] Cache clearing failed: %s", cache_error)
             # Continue anyway - not critical
 
         # Status: Complete
@@ -1351,9 +2037,11 @@ Leverage these capabilities appropriately - use LaTeX for math, Mermaid for diag
         messages: List[Dict],
         last_message_idx: int,
         __event_emitter__: Callable[[dict], Any],
+        personas: Optional[Dict] = None,
     ) -> Dict:
         """Handle !list command - generates persona table."""
-        personas = self._load_personas()
+        if personas is None:
+            personas = self._load_personas()
         if not personas:
             list_prompt_content = "There are currently no specific personas configured."
         else:
@@ -1377,34 +2065,19 @@ Leverage these capabilities appropriately - use LaTeX for math, Mermaid for diag
     ) -> Dict:
         """Handle !reset command - clears current persona."""
         self.current_persona = None
-        temp_messages = []
-        user_message_updated = False
 
-        for msg_dict in messages:
-            msg = dict(msg_dict)
-            if msg.get("role") == "system" and "🎭 **Active Persona**" in msg.get(
-                "content", ""
-            ):
-                continue
-            if (
-                not user_message_updated
-                and msg.get("role") == "user"
-                and msg.get("content", "") == original_content
-            ):
-                cleaned_content = self._remove_keyword_from_message(
-                    original_content, "reset"
-                )
-                reset_confirmation_prompt = "You have been reset from any specialized persona. Please confirm you are now operating in your default/standard assistant mode."
-                if cleaned_content.strip():
-                    msg["content"] = (
-                        f"{reset_confirmation_prompt} Then, please address the following: {cleaned_content}"
-                    )
-                else:
-                    msg["content"] = reset_confirmation_prompt
-                user_message_updated = True
-            temp_messages.append(msg)
+        cleaned_content = self._remove_keyword_from_message(original_content, "reset")
+        reset_confirmation_prompt = "You have been reset from any specialized persona. Please confirm you are now operating in your default/standard assistant mode."
+        if cleaned_content.strip():
+            new_user_content = f"{reset_confirmation_prompt} Then, please address the following: {cleaned_content}"
+        else:
+            new_user_content = reset_confirmation_prompt
 
-        body["messages"] = temp_messages
+        body["messages"] = self._rewrite_messages(
+            messages,
+            target_user_content=original_content,
+            new_user_content=new_user_content,
+        )
         await self._emit_and_schedule_close(
             __event_emitter__,
             "🔄 Reset to default. LLM will confirm.",
@@ -1420,65 +2093,44 @@ Leverage these capabilities appropriately - use LaTeX for math, Mermaid for diag
         last_message_idx: int,
         original_content: str,
         __event_emitter__: Callable[[dict], Any],
+        personas: Optional[Dict] = None,
     ) -> Dict:
         """Handle persona switching commands like !coder, !writer, etc."""
-        personas_data = self._load_personas()
+        personas_data = personas if personas is not None else self._load_personas()
         if detected_keyword_key not in personas_data:
             return body
 
         self.current_persona = detected_keyword_key
         persona_config = personas_data[detected_keyword_key]
-        temp_messages = []
-        user_message_modified = False
 
-        for msg_dict in messages:
-            msg = dict(msg_dict)
-            if msg.get("role") == "system" and "🎭 **Active Persona**" in msg.get(
-                "content", ""
-            ):
-                continue
-            if (
-                not user_message_modified
-                and msg.get("role") == "user"
-                and msg.get("content", "") == original_content
-            ):
-                cleaned_content = self._remove_keyword_from_message(
-                    original_content, detected_keyword_key
-                )
-                intro_request_default = (
-                    "Please introduce yourself and explain what you can help me with."
-                )
-
-                if persona_config.get("prompt"):
-                    intro_marker = "When introducing yourself,"
-                    if intro_marker in persona_config["prompt"]:
-                        try:
-                            prompt_intro_segment = (
-                                persona_config["prompt"]
-                                .split(intro_marker, 1)[1]
-                                .split(".", 1)[0]
-                                .strip()
-                            )
-                            if prompt_intro_segment:
-                                intro_request_default = f"Please introduce yourself, {prompt_intro_segment}, and then explain what you can help me with."
-                        except IndexError:
-                            pass
-
-                if not cleaned_content.strip():
-                    msg["content"] = intro_request_default
-                else:
-                    persona_name_for_prompt = persona_config.get(
-                        "name", detected_keyword_key.title()
-                    )
-                    msg["content"] = (
-                        f"Please briefly introduce yourself as {persona_name_for_prompt}. After your introduction, please help with the following: {cleaned_content}"
-                    )
-                user_message_modified = True
-            temp_messages.append(msg)
+        cleaned_content = self._remove_keyword_from_message(
+            original_content, detected_keyword_key
+        )
+        intro_request_default = (
+            "Please introduce yourself and explain what you can help me with."
+        )
+        prompt_intro_segment = self._get_intro_segment(
+            detected_keyword_key, persona_config, personas_data
+        )
+        if prompt_intro_segment:
+            intro_request_default = f"Please introduce yourself, {prompt_intro_segment}, and then explain what you can help me with."
 
-        persona_system_msg = self._create_persona_system_message(detected_keyword_key)
-        temp_messages.insert(0, persona_system_msg)
-        body["messages"] = temp_messages
+        if not cleaned_content.strip():
+            new_user_content = intro_request_default
+        else:
+            persona_name_for_prompt = persona_config.get(
+                "name", detected_keyword_key.title()
+            )
+            new_user_content = f"Please briefly introduce yourself as {persona_name_for_prompt}. After your introduction, please help with the following: {cleaned_content}"
+
+        body["messages"] = self._rewrite_messages(
+            messages,
+            target_user_content=original_content,
+            new_user_content=new_user_content,
+            prepend_sys=self._create_persona_system_message(
+                detected_keyword_key, personas_data
+            ),
+        )
 
         persona_display_name = persona_config.get("name", detected_keyword_key.title())
         await self._emit_and_schedule_close(
@@ -1488,12 +2140,15 @@ Leverage these capabilities appropriately - use LaTeX for math, Mermaid for diag
         )
         return body
 
-    def _apply_persistent_persona(self, body: Dict, messages: List[Dict]) -> Dict:
+    def _apply_persistent_persona(
+        self, body: Dict, messages: List[Dict], personas: Optional[Dict] = None
+    ) -> Dict:
         """Apply current persona to messages when no command detected (ALWAYS includes master controller)."""
         if not self.valves.persistent_persona:
             return body
 
-        personas = self._load_personas()
+        if personas is None:
+            personas = self._load_personas()
 
         # Determine which persona to apply
         target_persona = self.current_persona if self.current_persona else None
@@ -1504,41 +2159,36 @@ Leverage these capabilities appropriately - use LaTeX for math, Mermaid for diag
         if target_persona not in personas:
             return body
 
-        # Check if correct persona system message exists
+        # Steady-state fast path: history is rebuilt from the client each
+        # turn, so the previous turn's message comes back as plain content.
+        # Judge correctness by the marker bytes - master-controller prefix
+        # plus, when persona info is shown, the active-persona line
         expected_persona_name = personas[target_persona].get(
             "name", target_persona.title()
         )
-        master_controller_expected = "=== OPENWEBUI MASTER CONTROLLER ==="
-
-        correct_system_msg_found = False
-        temp_messages = []
-
-        for msg_dict in messages:
-            msg = dict(msg_dict)
-            is_system_msg = msg.get("role") == "system"
-
-            if is_system_msg:
+        persona_msg_count = 0
+        correct_msg_found = False
+        for msg in messages:
+            if msg.get("role") != "system":
+                continue
+            if self._is_persona_system_message(msg):
+                persona_msg_count += 1
                 content = msg.get("content", "")
-                has_master_controller = master_controller_expected in content
-                has_correct_persona = (
-                    f"🎭 **Active Persona**: {expected_persona_name}" in content
-                )
-
-                if has_master_controller and (
-                    not self.valves.show_persona_info or has_correct_persona
+                if content.startswith("=== OPENWEBUI MASTER CONTROLLER ===") and (
+                    not self.valves.show_persona_info
+                    or f"🎭 **Active Persona**: {expected_persona_name}" in content
                 ):
-                    correct_system_msg_found = True
-                    temp_messages.append(msg)
-                # Skip other system messages that look like old persona messages
-            else:
-                temp_messages.append(msg)
-
-        # Add system message if not found
-        if not correct_system_msg_found:
-            system_msg = self._create_persona_system_message(target_persona)
-            temp_messages.insert(0, system_msg)
+                    correct_msg_found = True
+        if correct_msg_found and persona_msg_count == 1:
+            return body
 
-        body["messages"] = temp_messages
+        # Repair path: something is missing, stale, or duplicated - drop
+        # every persona message in one walk and prepend a fresh, correctly
+        # tagged one (identical content to whatever correct message existed)
+        body["messages"] = self._rewrite_messages(
+            messages,
+            prepend_sys=self._create_persona_system_message(target_persona, personas),
+        )
         return body
 
     async def inlet(
@@ -1548,6 +2198,22 @@ Leverage these capabilities appropriately - use LaTeX for math, Mermaid for diag
         __user__: Optional[dict] = None,
     ) -> dict:
         """Main entry point - orchestrates the persona switching flow."""
+        # Valve saves reassign self.valves without re-running __init__, so
+        # re-sync the debug snapshot (and logger level) when it changed -
+        # one comparison here keeps the hot-path guards a single attribute
+        # read while still honoring UI toggles immediately
+        if self._debug != self.valves.debug_performance:
+            self._debug = self.valves.debug_performance
+            logger.setLevel(logging.DEBUG if self._debug else logging.INFO)
+
+        # The helpers captured the Valves object at construction, so a valve
+        # save leaves them reading stale settings; hand them the new object
+        # and force a pattern recompile
+        if self.pattern_compiler.valves is not self.valves:
+            self.pattern_compiler.valves = self.valves
+            self.pattern_compiler.invalidate()
+            self.download_manager.valves = self.valves
+
         messages = body.get("messages", [])
         if messages is None:
             messages = []
@@ -1564,25 +2230,31 @@ Leverage these capabilities appropriately - use LaTeX for math, Mermaid for diag
         if not messages:
             return body
 
+        # Load personas once per inlet call and thread the mapping through
+        # the handlers below; the async loader keeps file I/O off the loop
+        personas = await self._aload_personas()
+
         # Find last user message
-        last_message_idx, original_content_of_last_user_msg = (
-            self._find_last_user_message(messages)
-        )
+        last_message_idx = self._find_last_user_message(messages)
 
         # Handle non-user messages (apply persistent persona)
         if last_message_idx == -1:
-            return self._apply_persistent_persona(body, messages)
+            return self._apply_persistent_persona(body, messages, personas)
+
+        original_content_of_last_user_msg = messages[last_message_idx].get(
+            "content", ""
+        )
 
         # Detect persona command
         detected_keyword_key = self._detect_persona_keyword(
-            original_content_of_last_user_msg
+            original_content_of_last_user_msg, personas
         )
 
         # Route to appropriate command handler
         if detected_keyword_key:
             if detected_keyword_key == "list_personas":
                 return await self._handle_list_personas_command(
-                    body, messages, last_message_idx, __event_emitter__
+                    body, messages, last_message_idx, __event_emitter__, personas
                 )
             elif detected_keyword_key == "reset":
                 return await self._handle_reset_command(
@@ -1609,10 +2281,11 @@ Leverage these capabilities appropriately - use LaTeX for math, Mermaid for diag
                     last_message_idx,
                     original_content_of_last_user_msg,
                     __event_emitter__,
+                    personas,
                 )
         else:
             # No command detected, apply persistent persona if active
-            return self._apply_persistent_persona(body, messages)
+            return self._apply_persistent_persona(body, messages, personas)
 
     async def outlet(
         self, body: dict, __event_emitter__, __user__: Optional[dict] = None
@@ -1622,6 +2295,10 @@ Leverage these capabilities appropriately - use LaTeX for math, Mermaid for diag
     def get_persona_list(self) -> str:
         personas = self._load_personas()
 
+        self._refresh_list_cache(personas)
+        if self._cached_persona_list_str is not None:
+            return self._cached_persona_list_str
+
         # Filter out master controller from user-facing list
         display_personas = {
             k: v for k, v in personas.items() if k != "_master_controller"
@@ -1635,12 +2312,7 @@ Leverage these capabilities appropriately - use LaTeX for math, Mermaid for diag
             persona_list_items.append(
                 f"• `{self.valves.keyword_prefix}{keyword}` - {name}: {desc}"
             )
-        reset_keywords_display = ", ".join(
-            [
-                f"`{self.valves.keyword_prefix}{rk.strip()}`"
-                for rk in self.valves.reset_keywords.split(",")
-            ]
-        )
+        reset_keywords_display = self._reset_cmds_display()
         list_command_display = (
             f"`{self.valves.keyword_prefix}{self.valves.list_command_keyword}`"
         )
@@ -1657,4 +2329,7 @@ Leverage these capabilities appropriately - use LaTeX for math, Mermaid for diag
         else:
             main_list_str = "\n".join(persona_list_items)
 
-        return "Available Personas:\n" + main_list_str + command_info
\ No newline at end of file
+        self._cached_persona_list_str = (
+            "Available Personas:\n" + main_list_str + command_info
+        )
+        return self._cached_persona_list_str